@@ -1,22 +1,35 @@
 """
 bodies.py - Defines the Body class for the three-body simulation.
 
-This module contains the Body dataclass which represents a celestial body
+This module contains the Body class which represents a celestial body
 with mass, position, velocity, and other properties for visualization.
+The kinematic state is stored in a small NumPy array so that a
+PhysicsEngine can adopt it into its structure-of-arrays buffers.
 """
 
-from dataclasses import dataclass, field
-from collections import deque
+import numpy as np
 import pygame
 from pygame.math import Vector2
 from typing import Tuple, List, Optional
 
 
-@dataclass
 class Body:
     """
     Represents a celestial body in the simulation.
     
+    Position, velocity and acceleration are stored as the rows of a (3, 2)
+    float64 array. Once the body is passed to a PhysicsEngine, that array is
+    replaced by a view into the engine's SoA buffers, so the body becomes a
+    thin facade over its slice of the shared state. The ``pos``, ``vel`` and
+    ``acc`` properties return fresh Vector2 copies; assign to them (or use
+    augmented assignment) to modify the underlying state. The scalar
+    properties ``px``, ``py``, ``vx``, ``vy``, ``ax`` and ``ay`` read and
+    write single components without allocating a Vector2.
+    
+    The trail ring buffer is adopted the same way: a bound body's ``trail``
+    is its row of the engine's trail array, and the write index is shared
+    by all bodies of that engine, which records every trail in one store.
+    
     Attributes:
         mass: Mass of the body in kg
         pos: Position vector (x, y) in meters
@@ -24,47 +37,224 @@ class Body:
         radius: Radius for rendering in pixels
         color: RGB color tuple for rendering
         trail_length: Maximum number of positions to store in the trail
+        trail: Ring buffer of past positions, float32 array of shape (trail_length, 2)
+        trail_head: Index of the next trail slot to write (read-only)
+        trail_fill: Number of valid positions in the trail (read-only)
     """
-    mass: float
-    pos: Vector2
-    vel: Vector2
-    radius: int
-    color: Tuple[int, int, int]
-    trail_length: int = 500
-    
-    # Fields that are computed or initialized during runtime
-    acc: Vector2 = field(default_factory=lambda: Vector2(0, 0))
-    trail: deque = field(default_factory=deque)
-    
-    def __post_init__(self):
-        """Initialize fields after instance creation."""
-        # Convert pos and vel to Vector2 if they're not already
-        if not isinstance(self.pos, Vector2):
-            self.pos = Vector2(self.pos)
-        if not isinstance(self.vel, Vector2):
-            self.vel = Vector2(self.vel)
+    
+    __slots__ = ('_engine', '_mass', 'radius', 'color', 'trail_length', '_state', 'trail', '_trail_index')
+    
+    def __init__(self, mass: float, pos: Vector2, vel: Vector2, radius: int,
+                 color: Tuple[int, int, int], trail_length: int = 500):
+        """
+        Initialize a body.
         
-        # Initialize trail with current position
-        self.trail = deque(maxlen=self.trail_length)
-        self.trail.append(Vector2(self.pos))
+        Args:
+            mass: Mass of the body in kg
+            pos: Initial position (Vector2 or any 2-sequence)
+            vel: Initial velocity (Vector2 or any 2-sequence)
+            radius: Radius for rendering in pixels
+            color: RGB color tuple for rendering
+            trail_length: Maximum number of positions to store in the trail
+        """
+        self._engine = None  # PhysicsEngine this body is bound to, if any
+        self.mass = mass
+        self.radius = radius
+        self.color = color
+        self.trail_length = trail_length
+        
+        # Rows are position, velocity and acceleration
+        self._state = np.zeros((3, 2), dtype=np.float64)
+        self._state[0] = pos
+        self._state[1] = vel
+        
+        # Initialize trail ring buffer with current position
+        self.trail = np.empty((self.trail_length, 2), dtype=np.float32)
+        self._trail_index = [0, 0]  # [head, fill]; shared with the engine once bound
+        self.update_trail()
+    
+    def __repr__(self) -> str:
+        return (f"Body(mass={self.mass!r}, pos={self.pos!r}, vel={self.vel!r}, "
+                f"radius={self.radius!r}, color={self.color!r})")
+    
+    @property
+    def mass(self) -> float:
+        """Mass of the body in kg."""
+        return self._mass
+    
+    @mass.setter
+    def mass(self, value: float):
+        self._mass = value
+        
+        # Let the owning engine rebuild its cached mass products
+        if self._engine is not None:
+            self._engine.invalidate()
+    
+    @property
+    def pos(self) -> Vector2:
+        """Position vector (a copy of the underlying state)."""
+        return Vector2(self._state[0].tolist())
+    
+    @pos.setter
+    def pos(self, value):
+        self._state[0] = value
+        if self._engine is not None:
+            self._engine.mark_dirty()
+    
+    @property
+    def vel(self) -> Vector2:
+        """Velocity vector (a copy of the underlying state)."""
+        return Vector2(self._state[1].tolist())
+    
+    @vel.setter
+    def vel(self, value):
+        self._state[1] = value
+        if self._engine is not None:
+            self._engine.mark_dirty()
+    
+    @property
+    def acc(self) -> Vector2:
+        """Acceleration vector (a copy of the underlying state)."""
+        return Vector2(self._state[2].tolist())
+    
+    @acc.setter
+    def acc(self, value):
+        self._state[2] = value
+    
+    @property
+    def px(self) -> float:
+        """X position as a plain float."""
+        return self._state.item(0, 0)
+    
+    @px.setter
+    def px(self, value: float):
+        self._state[0, 0] = value
+        if self._engine is not None:
+            self._engine.mark_dirty()
+    
+    @property
+    def py(self) -> float:
+        """Y position as a plain float."""
+        return self._state.item(0, 1)
+    
+    @py.setter
+    def py(self, value: float):
+        self._state[0, 1] = value
+        if self._engine is not None:
+            self._engine.mark_dirty()
+    
+    @property
+    def vx(self) -> float:
+        """X velocity as a plain float."""
+        return self._state.item(1, 0)
+    
+    @vx.setter
+    def vx(self, value: float):
+        self._state[1, 0] = value
+        if self._engine is not None:
+            self._engine.mark_dirty()
+    
+    @property
+    def vy(self) -> float:
+        """Y velocity as a plain float."""
+        return self._state.item(1, 1)
+    
+    @vy.setter
+    def vy(self, value: float):
+        self._state[1, 1] = value
+        if self._engine is not None:
+            self._engine.mark_dirty()
+    
+    @property
+    def ax(self) -> float:
+        """X acceleration as a plain float."""
+        return self._state.item(2, 0)
+    
+    @ax.setter
+    def ax(self, value: float):
+        self._state[2, 0] = value
+    
+    @property
+    def ay(self) -> float:
+        """Y acceleration as a plain float."""
+        return self._state.item(2, 1)
+    
+    @ay.setter
+    def ay(self, value: float):
+        self._state[2, 1] = value
+    
+    @property
+    def trail_head(self) -> int:
+        """Index of the next trail slot to write."""
+        return self._trail_index[0]
+    
+    @property
+    def trail_fill(self) -> int:
+        """Number of valid positions in the trail."""
+        return min(self._trail_index[1], self.trail_length)
     
     def update_trail(self):
-        """Add current position to the trail."""
-        self.trail.append(Vector2(self.pos))
+        """
+        Add current position to the trail, overwriting the oldest entry when full.
+        
+        For a body bound to a PhysicsEngine this records the trails of all
+        of the engine's bodies, since they share one write index.
+        """
+        if self._engine is not None:
+            self._engine.record_trail()
+            return
+        if not self.trail_length:
+            return
+        index = self._trail_index
+        self.trail[index[0]] = self._state[0]
+        index[0] = (index[0] + 1) % self.trail_length
+        if index[1] < self.trail_length:
+            index[1] += 1
+    
+    def reset_trail(self):
+        """
+        Clear the trail and restart it from the current position.
+        
+        For a body bound to a PhysicsEngine this resets all of the engine's trails.
+        """
+        self._trail_index[0] = 0
+        self._trail_index[1] = 0
+        self.update_trail()
+    
+    def trail_points(self) -> np.ndarray:
+        """
+        Get the trail positions in chronological order.
+        
+        Returns:
+            Array of shape (trail_fill, 2), oldest position first
+        """
+        head, fill = self._trail_index
+        trail = self.trail
+        if fill < len(trail):
+            points = trail[:fill]
+        else:
+            points = np.concatenate((trail[head:], trail[:head]))
+        
+        # A bound body's ring may be longer than its own trail_length
+        if len(points) > self.trail_length:
+            points = points[len(points) - self.trail_length:]
+        return points
     
     def reset_acceleration(self):
         """Reset acceleration to zero."""
-        self.acc = Vector2(0, 0)
+        self._state[2] = 0.0
     
-    def apply_force(self, force: Vector2):
+    def apply_force(self, force: Tuple[float, float]):
         """
         Apply a force to the body, updating its acceleration.
         
         Args:
-            force: Force vector to apply (in Newtons)
+            force: Force (fx, fy) to apply in Newtons, as a tuple or Vector2
         """
         # F = ma -> a = F/m
-        self.acc += force / self.mass
+        state = self._state
+        state[2, 0] += force[0] / self.mass
+        state[2, 1] += force[1] / self.mass
     
     def update(self, dt: float):
         """
@@ -74,8 +264,11 @@ class Body:
             dt: Time step in seconds
         """
         # Simple Euler integration (can be replaced with more accurate methods)
-        self.vel += self.acc * dt
-        self.pos += self.vel * dt
+        state = self._state
+        state[1] += state[2] * dt
+        state[0] += state[1] * dt
+        if self._engine is not None:
+            self._engine.mark_dirty()
         self.update_trail()
     
     @classmethod
@@ -85,7 +278,7 @@ class Body:
         
         Args:
             data: Dictionary containing body parameters
-            
+        
         Returns:
             A new Body instance
         """
@@ -105,10 +298,12 @@ class Body:
         Returns:
             Dictionary representation of the Body
         """
+        pos = self.pos
+        vel = self.vel
         return {
             'mass': self.mass,
-            'position': [self.pos.x, self.pos.y],
-            'velocity': [self.vel.x, self.vel.y],
+            'position': [pos.x, pos.y],
+            'velocity': [vel.x, vel.y],
             'radius': self.radius,
             'color': list(self.color),
             'trail_length': self.trail_length
@@ -14,7 +14,8 @@ from bodies import Body
 from physics import PhysicsEngine
 from renderer import Renderer
 from ui import UIManager, Button, Slider
-from utils import load_config, save_config, create_default_config, save_simulation_state, load_simulation_state
+from utils import (load_config, save_config, create_default_config, save_simulation_state_npz,
+                   load_simulation_state)
 
 
 class Simulation:
@@ -57,7 +58,9 @@ class Simulation:
         # Create physics engine
         self.physics_engine = PhysicsEngine(
             G=self.physics_config.get("G", 6.674e-11),
-            scale_factor=self.physics_config.get("scale_factor", 1.0)
+            scale_factor=self.physics_config.get("scale_factor", 1.0),
+            softening=self.physics_config.get("softening", 1e-6),
+            method=self.physics_config.get("integration_method", "verlet")
         )
         
         # Create renderer
@@ -82,6 +85,9 @@ class Simulation:
         self.dragging = False
         self.last_mouse_pos = Vector2(0, 0)
         
+        # Bind the bodies and snapshot their initial state for resets
+        self.physics_engine.prepare(self.bodies)
+        
         # Initial energy for conservation tracking
         _, _, self.initial_energy = self.physics_engine.calculate_system_energy(self.bodies)
         
@@ -142,8 +148,8 @@ class Simulation:
     
     def reset_simulation(self):
         """Reset the simulation to initial state."""
-        self.bodies = self.create_bodies()
-        self.physics_engine.time_elapsed = 0.0
+        # Restore the SoA snapshot (and restart the trails) in place
+        self.physics_engine.reset()
         _, _, self.initial_energy = self.physics_engine.calculate_system_energy(self.bodies)
     
     def set_dt(self, value: float):
@@ -179,7 +185,7 @@ class Simulation:
                 elif event.key == pygame.K_MINUS:
                     self.dt *= 0.5
                 elif event.key == pygame.K_s:
-                    save_simulation_state(self.bodies, self.physics_config)
+                    save_simulation_state_npz(self.physics_engine, self.bodies, self.physics_config)
                 elif event.key == pygame.K_l:
                     # TODO: Add file dialog for loading
                     pass
@@ -208,8 +214,11 @@ class Simulation:
     def update(self):
         """Update the simulation state."""
         if not self.paused:
-            for _ in range(self.integrations_per_frame):
-                self.physics_engine.step(self.bodies, self.dt, self.integration_method)
+            # Only the last substep of a frame is visible, so only it feeds the trails
+            last = self.integrations_per_frame - 1
+            step = self.physics_engine.step
+            for i in range(self.integrations_per_frame):
+                step(self.bodies, self.dt, i == last)
     
     def draw(self):
         """Draw the simulation."""
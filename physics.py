@@ -3,176 +3,456 @@ physics.py - Physics engine for the three-body simulation.
 
 This module handles the gravitational interactions between bodies
 and implements numerical integration methods for updating the simulation.
+The engine keeps the state of all bodies in structure-of-arrays (SoA)
+NumPy buffers so that the pairwise force loop is a single vectorized
+broadcast instead of an interpreter-level double loop.
 """
 
 from typing import List, Tuple, Optional
+import numpy as np
 import pygame
-from pygame.math import Vector2
 from bodies import Body
+from physics_kernels import (NUMBA_AVAILABLE, compute_accel, compute_accel_parallel, compute_energy,
+                             get_num_threads, step_euler_n, step_verlet_n, step_verlet3)
 
 
 class PhysicsEngine:
     """
     Physics engine that handles gravitational interactions and numerical integration.
+    
+    The engine owns SoA buffers ``pos[N, 2]``, ``vel[N, 2]``, ``acc[N, 2]`` and
+    ``mass[N]``. Bodies passed to the integrators are adopted into these
+    buffers and act as views over their row from then on. When Numba is
+    installed the O(N^2) loops run in the compiled kernels from
+    ``physics_kernels``; otherwise they fall back to NumPy broadcasting.
     """
     
-    def __init__(self, G: float = 6.674e-11, scale_factor: float = 1.0):
+    def __init__(self, G: float = 6.674e-11, scale_factor: float = 1.0, softening: float = 1e-6,
+                 method: str = 'verlet'):
         """
         Initialize the physics engine.
         
         Args:
             G: Gravitational constant (can be scaled for simulation)
             scale_factor: Scaling factor for converting between simulation and display units
+            softening: Plummer softening length; keeps forces finite for close encounters.
+                Must be positive, since the kernels have no singularity checks.
+            method: Integration method used by ``step`` ('euler' or 'verlet')
+        
+        Raises:
+            ValueError: If softening is not positive
         """
-        self.G = G
+        if not softening > 0:
+            raise ValueError(f"softening must be positive, got {softening!r}")
+        self._G = G
         self.scale_factor = scale_factor
+        self.softening2 = softening * softening
         self.time_elapsed = 0.0  # Total simulation time elapsed
+        self.use_numba = NUMBA_AVAILABLE
+        self.set_method(method)
+        
+        # Body count from which the forces are computed on all Numba threads.
+        # The parallel kernel does twice the work of the serial one, so it is
+        # only used with more than two threads; checked when bodies are bound.
+        self.parallel_min_bodies = 256
+        self._parallel = False
+        
+        # SoA state shared with the bound bodies
+        self._bodies: List[Body] = []
+        self._state = np.zeros((3, 0, 2), dtype=np.float64)
+        self.pos = self._state[0]
+        self.vel = self._state[1]
+        self.acc = self._state[2]
+        self.mass = np.zeros(0, dtype=np.float64)
+        
+        # Mass products cached per configuration: G*m_j
+        self._Gm = np.zeros(0, dtype=np.float64)
+        
+        # Unique pair indices (i < j) and G*m_i*m_j over those pairs, used
+        # only by the NumPy energy path and built there on first use
+        self._iu = np.zeros(0, dtype=np.intp)
+        self._ju = np.zeros(0, dtype=np.intp)
+        self._Gmm_pairs: Optional[np.ndarray] = None
+        
+        # Trail ring buffers of all bodies, sharing one [head, fill] index.
+        # Trails are only drawn, so they are stored as float32 to halve the
+        # memory traffic of recording and transforming them.
+        self.trails = np.zeros((0, 0, 2), dtype=np.float32)
+        self._trail_index = [0, 0]
+        
+        # Snapshot of the state taken by prepare(), restored by reset()
+        self._state0 = np.zeros((3, 0, 2), dtype=np.float64)
+        
+        # Preallocated work buffers so the integrators do not allocate per step
+        self._old_acc = np.zeros((0, 2), dtype=np.float64)
+        self._scratch = np.zeros((0, 2), dtype=np.float64)
+        
+        # N x N work buffers of the NumPy force path, sized on first use
+        self._dx = np.zeros((0, 0, 2), dtype=np.float64)
+        self._inv_r3 = np.zeros((0, 0), dtype=np.float64)
+        
+        # Last (kinetic, potential, total) energy; recomputed only when stale
+        self._energy_cache: Optional[Tuple[float, float, float]] = None
+        self._energy_dirty = True
+        
+        # Whether ``acc`` holds the accelerations at the current positions.
+        # Verlet reuses the end-of-step accelerations as the start of the next
+        # step, so it only evaluates forces up front when this is False.
+        self._acc_valid = False
+    
+    def set_method(self, method: str):
+        """
+        Select the integration method used by ``step``.
+        
+        ``step`` is bound directly to the integrator so the per-substep call
+        does no dispatch. It takes the same arguments as the integrators.
+        
+        Args:
+            method: Integration method ('euler' or 'verlet'; anything else means Verlet)
+        """
+        self.method = method
+        if method.lower() == 'euler':
+            self.step = self.step_euler
+        else:  # Default to Verlet
+            self.step = self.step_verlet
+    
+    @property
+    def G(self) -> float:
+        """Gravitational constant."""
+        return self._G
+    
+    @G.setter
+    def G(self, value: float):
+        self._G = value
+        self.invalidate()
+    
+    def invalidate(self):
+        """Force the bodies to be re-bound and the cached mass products rebuilt."""
+        self._bodies = []
+        self._energy_dirty = True
+        self._acc_valid = False
+    
+    def mark_dirty(self):
+        """Mark the cached energy and accelerations as stale after an external state change."""
+        self._energy_dirty = True
+        self._acc_valid = False
     
-    def calculate_gravitational_force(self, body1: Body, body2: Body) -> Vector2:
+    def prepare(self, bodies: List[Body]):
+        """
+        Bind a new set of bodies and rebuild the cached mass products.
+        
+        The bodies' current state is also snapshotted so that ``reset`` can
+        restore it without rebuilding any Body objects.
+        
+        Args:
+            bodies: List of bodies in the simulation
+        """
+        self.invalidate()
+        self._sync_from_bodies(bodies)
+        self._state0 = self._state.copy()
+    
+    def bind(self, bodies: List[Body]):
+        """
+        Make sure ``bodies`` are the bound bodies, so ``pos``, ``vel`` and ``mass`` describe them.
+        
+        Unlike ``prepare`` this does not take a reset snapshot, and it is a
+        no-op when the same bodies are already bound.
+        
+        Args:
+            bodies: List of bodies in the simulation
+        """
+        self._sync_from_bodies(bodies)
+    
+    def reset(self):
+        """Restore the state snapshotted by the last ``prepare`` call, in place."""
+        np.copyto(self._state, self._state0)
+        self.reset_trails()
+        self.time_elapsed = 0.0
+        self._energy_dirty = True
+        self._acc_valid = False
+    
+    def _sync_from_bodies(self, bodies: List[Body]):
+        """
+        Pack the bodies into the SoA buffers and rebind them as views.
+        
+        This is a no-op when the same bodies are already bound, so the
+        integrators can call it on every step.
+        
+        Args:
+            bodies: List of bodies in the simulation
+        """
+        if bodies == self._bodies:
+            return
+        
+        n = len(bodies)
+        state = np.empty((3, n, 2), dtype=np.float64)
+        trail_length = max((body.trail_length for body in bodies), default=0)
+        trails = np.empty((n, trail_length, 2), dtype=np.float32)
+        trail_index = [0, 0]
+        for i, body in enumerate(bodies):
+            # An engine that loses a body must rebind before its next use,
+            # since its identity fast path cannot see the body move
+            if body._engine is not None and body._engine is not self:
+                body._engine.invalidate()
+            state[:, i] = body._state
+            body._state = state[:, i]
+            body.trail = trails[i]
+            body._trail_index = trail_index
+            body._engine = self
+        
+        self._bodies = list(bodies)
+        self._energy_dirty = True
+        self._acc_valid = False
+        self._state = state
+        self.pos = state[0]
+        self.vel = state[1]
+        self.acc = state[2]
+        self.mass = np.array([body.mass for body in bodies], dtype=np.float64)
+        self._Gm = self._G * self.mass
+        self._Gmm_pairs = None
+        self._parallel = n >= self.parallel_min_bodies and get_num_threads() > 2
+        self._old_acc = np.empty((n, 2), dtype=np.float64)
+        self._scratch = np.empty((n, 2), dtype=np.float64)
+        
+        # Trails restart from the current positions
+        self.trails = trails
+        self._trail_index = trail_index
+        self.record_trail()
+    
+    def record_trail(self):
+        """Append the current positions of all bound bodies to their trails in one store."""
+        trails = self.trails
+        length = trails.shape[1]
+        if not length:
+            return
+        index = self._trail_index
+        head = index[0]
+        trails[:, head] = self.pos  # Downcast to float32 on store
+        index[0] = (head + 1) % length
+        if index[1] < length:
+            index[1] += 1
+    
+    def reset_trails(self):
+        """Clear all trails and restart them from the current positions."""
+        self._trail_index[0] = 0
+        self._trail_index[1] = 0
+        self.record_trail()
+    
+    def _compute_accelerations(self):
+        """Recompute ``self.acc`` from the current positions."""
+        if self.use_numba:
+            if self._parallel:
+                compute_accel_parallel(self.pos, self._Gm, self.softening2, self.acc)
+            else:
+                compute_accel(self.pos, self._Gm, self.softening2, self.acc)
+            return
+        
+        pos = self.pos
+        n = len(pos)
+        if self._inv_r3.shape[0] != n:
+            self._dx = np.empty((n, n, 2), dtype=np.float64)
+            self._inv_r3 = np.empty((n, n), dtype=np.float64)
+        dx, inv_r3 = self._dx, self._inv_r3
+        
+        # Full N x N broadcast: it evaluates every pair twice, but avoids the
+        # scatter (np.add.at) a Newton's-third-law form needs, which is
+        # slower in NumPy. dx[i, j] is the vector from body i to body j.
+        np.subtract(pos[None, :, :], pos[:, None, :], out=dx)
+        np.einsum('ijk,ijk->ij', dx, dx, out=inv_r3)
+        inv_r3 += self.softening2
+        
+        # Skip self-interaction
+        np.fill_diagonal(inv_r3, np.inf)
+        inv_r3 **= -1.5
+        inv_r3 *= self._Gm[None, :]
+        np.einsum('ij,ijk->ik', inv_r3, dx, out=self.acc)
+    
+    def calculate_gravitational_force(self, body1: Body, body2: Body) -> Tuple[float, float]:
         """
         Calculate the gravitational force between two bodies.
         
         Args:
             body1: First body
             body2: Second body
-            
+        
         Returns:
-            Force vector acting on body1 due to body2
+            Force (fx, fy) acting on body1 due to body2
         """
-        # Vector from body1 to body2
-        r_vector = body2.pos - body1.pos
-        
-        # Distance between bodies
-        distance = r_vector.length()
-        
-        # Avoid division by zero or very small values
-        if distance < 1e-10:
-            return Vector2(0, 0)
+        return self._grav(body1.px, body1.py, body1.mass, body2.px, body2.py, body2.mass,
+                          self._G, self.softening2)
+    
+    @staticmethod
+    def _grav(px1: float, py1: float, m1: float, px2: float, py2: float, m2: float,
+              G: float, softening2: float) -> Tuple[float, float]:
+        """
+        Calculate the softened gravitational force between two point masses.
         
-        # Magnitude of force: F = G * m1 * m2 / r^2
-        force_magnitude = self.G * body1.mass * body2.mass / (distance * distance)
+        Args:
+            px1, py1: Position of the first mass
+            m1: First mass
+            px2, py2: Position of the second mass
+            m2: Second mass
+            G: Gravitational constant
+            softening2: Squared Plummer softening length
         
-        # Direction of force (unit vector)
-        # Use a safer normalization to avoid numerical issues
-        try:
-            direction = r_vector / distance  # More numerically stable than normalize()
-        except (ValueError, ZeroDivisionError):
-            return Vector2(0, 0)
+        Returns:
+            Force (fx, fy) acting on the first mass due to the second
+        """
+        # Vector from the first mass to the second
+        dx = px2 - px1
+        dy = py2 - py1
+        r2 = dx * dx + dy * dy + softening2
         
-        # Force vector
-        return direction * force_magnitude
+        # F = G * m1 * m2 * r_vector / r^3, which needs no square root;
+        # the softening keeps this finite without a singularity branch.
+        # A single pow is cheaper in Python than 1/sqrt and two multiplies.
+        k = G * m1 * m2 * r2 ** -1.5
+        return dx * k, dy * k
     
     def calculate_system_energy(self, bodies: List[Body]) -> Tuple[float, float, float]:
         """
         Calculate the total energy of the system (kinetic + potential).
         
+        The result is cached until the next integration step or state change,
+        so calling this every frame costs a tuple lookup.
+        
         Args:
             bodies: List of bodies in the simulation
-            
+        
         Returns:
             Tuple of (kinetic_energy, potential_energy, total_energy)
         """
-        kinetic_energy = 0.0
-        potential_energy = 0.0
-        
-        # Calculate kinetic energy: KE = 0.5 * m * v^2
-        for body in bodies:
-            # Use dot product for better numerical stability
-            v_squared = body.vel.dot(body.vel)
-            kinetic_energy += 0.5 * body.mass * v_squared
-        
-        # Calculate potential energy: PE = -G * m1 * m2 / r
-        for i in range(len(bodies)):
-            for j in range(i + 1, len(bodies)):
-                body1, body2 = bodies[i], bodies[j]
-                r_vector = body2.pos - body1.pos
-                distance = r_vector.length()
-                
-                # Use a minimum distance to avoid singularities
-                if distance < 1e-10:
-                    distance = 1e-10
-                    
-                potential_energy -= self.G * body1.mass * body2.mass / distance
+        self._sync_from_bodies(bodies)
+        if not self._energy_dirty:
+            return self._energy_cache
+        
+        self._energy_cache = self._compute_energy()
+        self._energy_dirty = False
+        return self._energy_cache
+    
+    def _compute_energy(self) -> Tuple[float, float, float]:
+        """Compute (kinetic, potential, total) energy from the SoA buffers."""
+        pos, vel, mass = self.pos, self.vel, self.mass
+        
+        if self.use_numba:
+            kinetic_energy, potential_energy = compute_energy(pos, vel, mass, self._Gm, self.softening2)
+            return kinetic_energy, potential_energy, kinetic_energy + potential_energy
+        
+        # Calculate kinetic energy: KE = 0.5 * m * v^2, reduced in one pass
+        kinetic_energy = 0.5 * float(np.einsum('i,ij,ij->', mass, vel, vel))
+        
+        # Calculate potential energy over unique pairs: PE = -G * m1 * m2 / r
+        if self._Gmm_pairs is None:
+            n = len(mass)
+            if len(self._iu) != n * (n - 1) // 2:
+                self._iu, self._ju = np.triu_indices(n, 1)
+            self._Gmm_pairs = self._Gm[self._iu] * mass[self._ju]
+        i, j = self._iu, self._ju
+        r_vector = pos[j] - pos[i]
+        
+        # Use the same softened distance as the force calculation
+        distance = np.einsum('ij,ij->i', r_vector, r_vector)
+        distance += self.softening2
+        np.sqrt(distance, out=distance)
+        potential_energy = -float(np.dot(self._Gmm_pairs, 1.0 / distance))
         
         total_energy = kinetic_energy + potential_energy
         return kinetic_energy, potential_energy, total_energy
     
-    def step_euler(self, bodies: List[Body], dt: float):
+    def step_euler(self, bodies: List[Body], dt: float, record_trail: bool = True):
         """
         Update the simulation using the simple Euler method.
         
         Args:
             bodies: List of bodies to update
             dt: Time step in seconds
+            record_trail: Whether to append the new positions to the trails
         """
-        # Reset accelerations
-        for body in bodies:
-            body.reset_acceleration()
+        self._sync_from_bodies(bodies)
         
-        # Calculate forces and update accelerations
-        for i in range(len(bodies)):
-            for j in range(len(bodies)):
-                if i != j:  # Skip self-interaction
-                    force = self.calculate_gravitational_force(bodies[i], bodies[j])
-                    bodies[i].apply_force(force)
+        if self.use_numba and not self._parallel:
+            # Whole step in one compiled call
+            step_euler_n(self.pos, self.vel, self.acc, self._Gm, self.softening2, dt)
+        else:
+            # Calculate accelerations at the current positions
+            self._compute_accelerations()
+            
+            # Update velocities, then positions with the new velocities
+            pos, vel, scratch = self.pos, self.vel, self._scratch
+            np.multiply(self.acc, dt, out=scratch)
+            vel += scratch
+            np.multiply(vel, dt, out=scratch)
+            pos += scratch
         
-        # Update positions and velocities
-        for body in bodies:
-            body.update(dt)
+        if record_trail:
+            self.record_trail()
         
         # Update simulation time
         self.time_elapsed += dt
+        self._energy_dirty = True
+        self._acc_valid = False  # acc is from the start of the step
     
-    def step_verlet(self, bodies: List[Body], dt: float):
+    def step_verlet(self, bodies: List[Body], dt: float, record_trail: bool = True):
         """
         Update the simulation using the Velocity Verlet method for better energy conservation.
         
         Args:
             bodies: List of bodies to update
             dt: Time step in seconds
+            record_trail: Whether to append the new positions to the trails
         """
-        # Store initial accelerations
-        old_acc = [Vector2(body.acc) for body in bodies]
+        self._sync_from_bodies(bodies)
         
-        # Position update using current velocity and acceleration
-        # x(t+dt) = x(t) + v(t)*dt + 0.5*a(t)*dt^2
-        for i, body in enumerate(bodies):
-            # Use separate calculations to avoid accumulation of floating-point errors
-            vel_term = body.vel * dt
-            acc_term = 0.5 * old_acc[i] * dt * dt
-            body.pos += vel_term + acc_term
-            body.update_trail()
-        
-        # Reset accelerations
-        for body in bodies:
-            body.reset_acceleration()
-        
-        # Recalculate forces and update accelerations at new positions
-        for i in range(len(bodies)):
-            for j in range(len(bodies)):
-                if i != j:  # Skip self-interaction
-                    force = self.calculate_gravitational_force(bodies[i], bodies[j])
-                    bodies[i].apply_force(force)
+        # Each step ends with the accelerations at the new positions, so the
+        # forces only need evaluating here on the first step after a change
+        if not self._acc_valid:
+            self._compute_accelerations()
         
-        # Velocity update using average of old and new accelerations
-        # v(t+dt) = v(t) + 0.5*(a(t) + a(t+dt))*dt
-        for i, body in enumerate(bodies):
-            acc_avg = 0.5 * (old_acc[i] + body.acc)
-            body.vel += acc_avg * dt
+        if self.use_numba and not self._parallel:
+            if len(self.mass) == 3:
+                # Fully unrolled kernel for the canonical three-body case
+                step_verlet3(self.pos, self.vel, self.acc, self._Gm, self.softening2, dt)
+            else:
+                step_verlet_n(self.pos, self.vel, self.acc, self._old_acc, self._Gm, self.softening2, dt)
+        else:
+            # NumPy drift and kick around the (possibly threaded) force kernel
+            self._verlet_update(dt)
+        
+        if record_trail:
+            self.record_trail()
         
         # Update simulation time
         self.time_elapsed += dt
+        self._energy_dirty = True
+        self._acc_valid = True
     
-    def step(self, bodies: List[Body], dt: float, method: str = 'verlet'):
+    def _verlet_update(self, dt: float):
         """
-        Update the simulation using the specified integration method.
+        Advance the SoA state by one Velocity Verlet step for any number of bodies.
         
         Args:
-            bodies: List of bodies to update
             dt: Time step in seconds
-            method: Integration method ('euler' or 'verlet')
         """
-        if method.lower() == 'euler':
-            self.step_euler(bodies, dt)
-        else:  # Default to Verlet
-            self.step_verlet(bodies, dt)
+        half_dt = 0.5 * dt
+        half_dt2 = half_dt * dt
+        pos, vel, acc = self.pos, self.vel, self.acc
+        old_acc, scratch = self._old_acc, self._scratch
+        
+        # Store initial accelerations
+        np.copyto(old_acc, acc)
+        
+        # Position update using current velocity and acceleration
+        # x(t+dt) = x(t) + v(t)*dt + 0.5*a(t)*dt^2
+        np.multiply(vel, dt, out=scratch)
+        pos += scratch
+        np.multiply(old_acc, half_dt2, out=scratch)
+        pos += scratch
+        
+        # Recalculate accelerations at new positions
+        self._compute_accelerations()
+        
+        # Velocity update using average of old and new accelerations
+        # v(t+dt) = v(t) + 0.5*(a(t) + a(t+dt))*dt
+        np.add(old_acc, acc, out=scratch)
+        scratch *= half_dt
+        vel += scratch
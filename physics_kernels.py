@@ -0,0 +1,267 @@
+"""
+physics_kernels.py - Compiled kernels for the three-body simulation.
+
+This module contains the O(N^2) inner loops of the physics engine written
+as plain loops over the SoA arrays and compiled with Numba. Numba is an
+optional dependency; when it is not installed the kernels are still
+importable as (slow) pure-Python functions and NUMBA_AVAILABLE is False,
+so the engine can fall back to its NumPy implementation.
+"""
+
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function uncompiled."""
+        def decorator(func):
+            return func
+        return decorator
+    
+    def get_num_threads():
+        """Stand-in for numba.get_num_threads; without Numba there is one thread."""
+        return 1
+
+
+@njit(fastmath=True, cache=True)
+def compute_accel(pos, Gm, softening2, acc):
+    """
+    Compute gravitational accelerations for all bodies.
+    
+    Each unique pair is visited once and Newton's third law is used to
+    update both bodies, halving the pair work of the full N^2 loop.
+    Plummer softening keeps the loop free of singularity checks, and the
+    accelerations are accumulated directly (G*m_j*r/r^3) rather than as
+    forces divided by mass.
+    
+    Args:
+        pos: Positions, float64 array of shape (N, 2)
+        Gm: Gravitational constant times mass, float64 array of shape (N,)
+        softening2: Squared Plummer softening length
+        acc: Output array of shape (N, 2), overwritten in place
+    """
+    n = pos.shape[0]
+    acc[:, :] = 0.0
+    for i in range(n):
+        # Body i has already received the reactions from all j < i; keep
+        # its running sum in registers and store it once
+        ax = acc[i, 0]
+        ay = acc[i, 1]
+        xi = pos[i, 0]
+        yi = pos[i, 1]
+        Gmi = Gm[i]
+        for j in range(i + 1, n):
+            dx = pos[j, 0] - xi
+            dy = pos[j, 1] - yi
+            r2 = dx * dx + dy * dy + softening2
+            inv_r3 = r2 ** -1.5
+            kj = Gm[j] * inv_r3
+            ki = Gmi * inv_r3
+            ax += kj * dx
+            ay += kj * dy
+            acc[j, 0] -= ki * dx
+            acc[j, 1] -= ki * dy
+        acc[i, 0] = ax
+        acc[i, 1] = ay
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def compute_accel_parallel(pos, Gm, softening2, acc):
+    """
+    Compute gravitational accelerations for all bodies across threads.
+    
+    Each thread owns a range of bodies i and sums over every j, so no two
+    threads write the same row. This visits every pair twice, twice the
+    work of ``compute_accel``, and only pays off for large N on
+    machines with more than two threads.
+    
+    Args:
+        pos: Positions, float64 array of shape (N, 2)
+        Gm: Gravitational constant times mass, float64 array of shape (N,)
+        softening2: Squared Plummer softening length
+        acc: Output array of shape (N, 2), overwritten in place
+    """
+    n = pos.shape[0]
+    for i in prange(n):
+        ax = 0.0
+        ay = 0.0
+        xi = pos[i, 0]
+        yi = pos[i, 1]
+        for j in range(n):
+            if j == i:
+                continue
+            dx = pos[j, 0] - xi
+            dy = pos[j, 1] - yi
+            r2 = dx * dx + dy * dy + softening2
+            kj = Gm[j] * r2 ** -1.5
+            ax += kj * dx
+            ay += kj * dy
+        acc[i, 0] = ax
+        acc[i, 1] = ay
+
+
+@njit(fastmath=True, cache=True)
+def step_euler_n(pos, vel, acc, Gm, softening2, dt):
+    """
+    Advance N bodies by one semi-implicit Euler step, in place.
+    
+    Args:
+        pos: Positions, float64 array of shape (N, 2)
+        vel: Velocities, float64 array of shape (N, 2)
+        acc: Output array of shape (N, 2) for the accelerations used
+        Gm: Gravitational constant times mass, float64 array of shape (N,)
+        softening2: Squared Plummer softening length
+        dt: Time step in seconds
+    """
+    compute_accel(pos, Gm, softening2, acc)
+    for i in range(pos.shape[0]):
+        for k in range(2):
+            vel[i, k] += acc[i, k] * dt
+            pos[i, k] += vel[i, k] * dt
+
+
+@njit(fastmath=True, cache=True)
+def step_verlet_n(pos, vel, acc, old_acc, Gm, softening2, dt):
+    """
+    Advance N bodies by one Velocity Verlet step, in place.
+    
+    Args:
+        pos: Positions, float64 array of shape (N, 2)
+        vel: Velocities, float64 array of shape (N, 2)
+        acc: Accelerations at the start of the step, shape (N, 2);
+            overwritten with the accelerations at the end of the step
+        old_acc: Work array of shape (N, 2)
+        Gm: Gravitational constant times mass, float64 array of shape (N,)
+        softening2: Squared Plummer softening length
+        dt: Time step in seconds
+    """
+    n = pos.shape[0]
+    half_dt = 0.5 * dt
+    half_dt2 = half_dt * dt
+    
+    # Drift: x(t+dt) = x(t) + v(t)*dt + 0.5*a(t)*dt^2
+    for i in range(n):
+        for k in range(2):
+            old_acc[i, k] = acc[i, k]
+            pos[i, k] += vel[i, k] * dt + acc[i, k] * half_dt2
+    
+    compute_accel(pos, Gm, softening2, acc)
+    
+    # Kick: v(t+dt) = v(t) + 0.5*(a(t) + a(t+dt))*dt
+    for i in range(n):
+        for k in range(2):
+            vel[i, k] += (old_acc[i, k] + acc[i, k]) * half_dt
+
+
+@njit(fastmath=True, cache=True)
+def compute_energy(pos, vel, mass, Gm, softening2):
+    """
+    Compute the kinetic and potential energy of the system.
+    
+    Args:
+        pos: Positions, float64 array of shape (N, 2)
+        vel: Velocities, float64 array of shape (N, 2)
+        mass: Masses, float64 array of shape (N,)
+        Gm: Gravitational constant times mass, float64 array of shape (N,)
+        softening2: Squared Plummer softening length
+    
+    Returns:
+        Tuple of (kinetic_energy, potential_energy)
+    """
+    n = pos.shape[0]
+    kinetic = 0.0
+    potential = 0.0
+    for i in range(n):
+        kinetic += 0.5 * mass[i] * (vel[i, 0] * vel[i, 0] + vel[i, 1] * vel[i, 1])
+        Gmi = Gm[i]
+        for j in range(i + 1, n):
+            dx = pos[j, 0] - pos[i, 0]
+            dy = pos[j, 1] - pos[i, 1]
+            potential -= Gmi * mass[j] / np.sqrt(dx * dx + dy * dy + softening2)
+    return kinetic, potential
+
+
+@njit(fastmath=True, cache=True)
+def step_verlet3(pos, vel, acc, Gm, softening2, dt):
+    """
+    Advance exactly three bodies by one Velocity Verlet step, in place.
+    
+    The three pair interactions are written out by hand so the step has no
+    loops or index arithmetic; the compiler keeps the whole state in
+    registers between the drift, force and kick phases.
+    
+    Args:
+        pos: Positions, float64 array of shape (3, 2)
+        vel: Velocities, float64 array of shape (3, 2)
+        acc: Accelerations at the start of the step, shape (3, 2);
+            overwritten with the accelerations at the end of the step
+        Gm: Gravitational constant times mass, float64 array of shape (3,)
+        softening2: Squared Plummer softening length
+        dt: Time step in seconds
+    """
+    half_dt = 0.5 * dt
+    half_dt2 = half_dt * dt
+    
+    # Accelerations at the start of the step
+    oax0 = acc[0, 0]
+    oay0 = acc[0, 1]
+    oax1 = acc[1, 0]
+    oay1 = acc[1, 1]
+    oax2 = acc[2, 0]
+    oay2 = acc[2, 1]
+    
+    # Drift: x(t+dt) = x(t) + v(t)*dt + 0.5*a(t)*dt^2
+    x0 = pos[0, 0] + vel[0, 0] * dt + oax0 * half_dt2
+    y0 = pos[0, 1] + vel[0, 1] * dt + oay0 * half_dt2
+    x1 = pos[1, 0] + vel[1, 0] * dt + oax1 * half_dt2
+    y1 = pos[1, 1] + vel[1, 1] * dt + oay1 * half_dt2
+    x2 = pos[2, 0] + vel[2, 0] * dt + oax2 * half_dt2
+    y2 = pos[2, 1] + vel[2, 1] * dt + oay2 * half_dt2
+    
+    # The three pair interactions
+    dx01 = x1 - x0
+    dy01 = y1 - y0
+    inv01 = (dx01 * dx01 + dy01 * dy01 + softening2) ** -1.5
+    dx02 = x2 - x0
+    dy02 = y2 - y0
+    inv02 = (dx02 * dx02 + dy02 * dy02 + softening2) ** -1.5
+    dx12 = x2 - x1
+    dy12 = y2 - y1
+    inv12 = (dx12 * dx12 + dy12 * dy12 + softening2) ** -1.5
+    
+    Gm0 = Gm[0]
+    Gm1 = Gm[1]
+    Gm2 = Gm[2]
+    ax0 = Gm1 * inv01 * dx01 + Gm2 * inv02 * dx02
+    ay0 = Gm1 * inv01 * dy01 + Gm2 * inv02 * dy02
+    ax1 = Gm2 * inv12 * dx12 - Gm0 * inv01 * dx01
+    ay1 = Gm2 * inv12 * dy12 - Gm0 * inv01 * dy01
+    ax2 = -Gm0 * inv02 * dx02 - Gm1 * inv12 * dx12
+    ay2 = -Gm0 * inv02 * dy02 - Gm1 * inv12 * dy12
+    
+    pos[0, 0] = x0
+    pos[0, 1] = y0
+    pos[1, 0] = x1
+    pos[1, 1] = y1
+    pos[2, 0] = x2
+    pos[2, 1] = y2
+    
+    # Kick: v(t+dt) = v(t) + 0.5*(a(t) + a(t+dt))*dt
+    vel[0, 0] += (oax0 + ax0) * half_dt
+    vel[0, 1] += (oay0 + ay0) * half_dt
+    vel[1, 0] += (oax1 + ax1) * half_dt
+    vel[1, 1] += (oay1 + ay1) * half_dt
+    vel[2, 0] += (oax2 + ax2) * half_dt
+    vel[2, 1] += (oay2 + ay2) * half_dt
+    
+    acc[0, 0] = ax0
+    acc[0, 1] = ay0
+    acc[1, 0] = ax1
+    acc[1, 1] = ay1
+    acc[2, 0] = ax2
+    acc[2, 1] = ay2
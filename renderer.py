@@ -5,6 +5,7 @@ This module handles the visualization of bodies, trails, and UI elements
 using Pygame.
 """
 
+import numpy as np
 import pygame
 from pygame.math import Vector2
 from typing import List, Tuple, Dict, Any, Optional
@@ -30,6 +31,16 @@ class Camera:
         self.center = Vector2(width // 2, height // 2)
         self.offset = Vector2(0, 0)
         self.scale = scale
+        
+        # center - offset as an array, for batch transforms; float32 to match
+        # the trail buffers so the transform never upcasts to float64
+        self._origin_np = np.zeros(2, dtype=np.float32)
+        self._update_origin()
+    
+    def _update_origin(self):
+        """Refresh the cached screen origin after the offset changes."""
+        self._origin_np[0] = self.center.x - self.offset.x
+        self._origin_np[1] = self.center.y - self.offset.y
     
     def world_to_screen(self, position: Vector2) -> Vector2:
         """
@@ -45,6 +56,33 @@ class Camera:
         screen_pos = (position * self.scale) - self.offset + self.center
         return screen_pos
     
+    def world_to_screen_xy(self, x: float, y: float) -> Tuple[float, float]:
+        """
+        Convert world coordinates to screen coordinates without allocating vectors.
+        
+        Args:
+            x: World x coordinate
+            y: World y coordinate
+            
+        Returns:
+            Tuple of (screen_x, screen_y)
+        """
+        scale = self.scale
+        return (x * scale - self.offset.x + self.center.x,
+                y * scale - self.offset.y + self.center.y)
+    
+    def world_to_screen_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Convert an array of world coordinates to screen coordinates.
+        
+        Args:
+            points: Array of shape (N, 2) in world coordinates
+            
+        Returns:
+            Array of shape (N, 2) in screen coordinates (float32 for float32 input)
+        """
+        return points * self.scale + self._origin_np
+    
     def screen_to_world(self, screen_pos: Vector2) -> Vector2:
         """
         Convert screen coordinates to world coordinates.
@@ -83,6 +121,7 @@ class Camera:
         new_world_pos = self.screen_to_world(mouse_pos)
         world_offset = world_pos - new_world_pos
         self.offset -= world_offset * self.scale
+        self._update_origin()
     
     def pan(self, delta: Vector2):
         """
@@ -92,6 +131,7 @@ class Camera:
             delta: Amount to pan in screen coordinates
         """
         self.offset += delta / self.scale
+        self._update_origin()
 
 
 class Renderer:
@@ -115,6 +155,7 @@ class Renderer:
         self.font = None
         self.camera = Camera(width, height)
         self.trail_alpha = 150  # Alpha value for trail points
+        self.trail_bands = 16  # Alpha steps per trail; each step is one draw call
         
         # Initialize Pygame if not already done
         if not pygame.get_init():
@@ -124,6 +165,16 @@ class Renderer:
         self.screen = pygame.display.set_mode((width, height))
         pygame.display.set_caption("Three-Body Problem Simulation")
         self.font = pygame.font.SysFont("Arial", 16)
+        
+        # Persistent alpha surface shared by all trails, cleared once per frame
+        self._trail_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        
+        # Trail alpha bands (start, stop, RGBA) keyed by (color, number of points)
+        self._trail_band_cache: Dict[Tuple[Tuple[int, int, int], int], List[Tuple[int, int, Tuple[int, int, int, int]]]] = {}
+        
+        # Rendered HUD lines that rarely change (status, body count, dt, zoom)
+        self._text_cache: Dict[str, pygame.Surface] = {}
+        self._text_cache_size = 64
     
     def draw_body(self, body: Body):
         """
@@ -133,45 +184,65 @@ class Renderer:
             body: The body to draw
         """
         # Convert world position to screen position
-        screen_pos = self.camera.world_to_screen(body.pos)
+        sx, sy = self.camera.world_to_screen_xy(body.px, body.py)
         
         # Scale radius based on camera zoom
         scaled_radius = max(1, int(body.radius * self.camera.scale))
         
         # Draw the body
-        pygame.draw.circle(self.screen, body.color, (int(screen_pos.x), int(screen_pos.y)), scaled_radius)
+        pygame.draw.circle(self.screen, body.color, (int(sx), int(sy)), scaled_radius)
     
     def draw_trail(self, body: Body):
         """
-        Draw the trail of a body.
+        Draw the trail of a body onto the shared trail surface.
+        
+        The surface is cleared and blitted to the screen once per frame by
+        ``draw``, so all trails share a single full-screen alpha pass.
         
         Args:
             body: The body whose trail to draw
         """
-        if len(body.trail) < 2:
+        if body.trail_fill < 2:
             return
         
-        # Convert trail points to screen coordinates
-        screen_points = [self.camera.world_to_screen(pos) for pos in body.trail]
-        
-        # Create a surface for the trail with alpha blending
-        trail_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        
-        # Draw trail as a series of lines with decreasing alpha
-        alpha_step = self.trail_alpha / len(screen_points)
-        for i in range(1, len(screen_points)):
-            alpha = int(i * alpha_step)
-            color_with_alpha = (*body.color, alpha)
-            pygame.draw.line(
-                trail_surface, 
-                color_with_alpha,
-                (int(screen_points[i-1].x), int(screen_points[i-1].y)),
-                (int(screen_points[i].x), int(screen_points[i].y)),
-                max(1, int(body.radius * self.camera.scale // 3))
-            )
-        
-        # Blit the trail surface onto the main screen
-        self.screen.blit(trail_surface, (0, 0))
+        # Convert all trail points to integer screen coordinates at once
+        screen_points = self.camera.world_to_screen_batch(body.trail_points()).astype(np.int32).tolist()
+        
+        trail_surface = self._trail_surface
+        width = max(1, int(body.radius * self.camera.scale // 3))
+        
+        # Draw the trail as a polyline per alpha band, fading in towards the body
+        draw_lines = pygame.draw.lines
+        for start, stop, color in self._get_trail_bands(body.color, len(screen_points)):
+            draw_lines(trail_surface, color, False, screen_points[start:stop], width)
+    
+    def _get_trail_bands(self, color: Tuple[int, int, int],
+                         n: int) -> List[Tuple[int, int, Tuple[int, int, int, int]]]:
+        """
+        Split a trail into runs of constant alpha, fading in towards the body.
+        
+        Adjacent runs share their boundary point so the polyline is unbroken.
+        
+        Args:
+            color: RGB color of the body
+            n: Number of trail points (at least 2)
+            
+        Returns:
+            List of (start, stop, rgba) point slices, oldest first
+        """
+        key = (color, n)
+        bands = self._trail_band_cache.get(key)
+        if bands is None:
+            r, g, b = color
+            n_bands = min(self.trail_bands, n - 1)
+            edges = np.linspace(0, n - 1, n_bands + 1).astype(np.int64).tolist()
+            bands = []
+            for start, end in zip(edges[:-1], edges[1:]):
+                # Alpha of the band's middle segment, as if drawn per segment
+                alpha = int((start + end + 1) // 2 * (self.trail_alpha / n))
+                bands.append((start, end + 1, (r, g, b, alpha)))
+            self._trail_band_cache[key] = bands
+        return bands
     
     def draw_hud(self, physics_engine, bodies: List[Body], dt: float, fps: float, paused: bool):
         """
@@ -187,26 +258,44 @@ class Renderer:
         # Calculate system energy
         kinetic, potential, total = physics_engine.calculate_system_energy(bodies)
         
-        # Prepare text lines
+        # Prepare text lines, flagging the ones worth caching
         lines = [
-            f"FPS: {fps:.1f}",
-            f"Sim time: {physics_engine.time_elapsed:.2f} s",
-            f"dt: {dt:.6f} s",
-            f"Bodies: {len(bodies)}",
-            f"Zoom: {self.camera.scale:.2f}x",
-            f"KE: {kinetic:.2e}",
-            f"PE: {potential:.2e}",
-            f"Total E: {total:.2e}",
-            "PAUSED" if paused else "RUNNING"
+            (f"FPS: {fps:.1f}", False),
+            (f"Sim time: {physics_engine.time_elapsed:.2f} s", False),
+            (f"dt: {dt:.6f} s", True),
+            (f"Bodies: {len(bodies)}", True),
+            (f"Zoom: {self.camera.scale:.2f}x", True),
+            (f"KE: {kinetic:.2e}", False),
+            (f"PE: {potential:.2e}", False),
+            (f"Total E: {total:.2e}", False),
+            ("PAUSED" if paused else "RUNNING", True)
         ]
         
         # Draw text lines
         y_offset = 10
-        for line in lines:
-            text_surface = self.font.render(line, True, (255, 255, 255))
+        for line, cacheable in lines:
+            text_surface = self._render_text(line) if cacheable else self.font.render(line, True, (255, 255, 255))
             self.screen.blit(text_surface, (10, y_offset))
             y_offset += 20
     
+    def _render_text(self, line: str) -> pygame.Surface:
+        """
+        Render a HUD line, reusing a cached surface when possible.
+        
+        Args:
+            line: Text to render
+            
+        Returns:
+            Rendered text surface
+        """
+        text_surface = self._text_cache.get(line)
+        if text_surface is None:
+            if len(self._text_cache) >= self._text_cache_size:
+                self._text_cache.clear()
+            text_surface = self.font.render(line, True, (255, 255, 255))
+            self._text_cache[line] = text_surface
+        return text_surface
+    
     def draw(self, physics_engine, bodies: List[Body], dt: float, fps: float, paused: bool):
         """
         Draw the complete scene.
@@ -221,9 +310,11 @@ class Renderer:
         # Fill background
         self.screen.fill(self.background_color)
         
-        # Draw trails
+        # Draw trails onto the shared alpha surface, then composite once
+        self._trail_surface.fill((0, 0, 0, 0))
         for body in bodies:
             self.draw_trail(body)
+        self.screen.blit(self._trail_surface, (0, 0))
         
         # Draw bodies
         for body in bodies:
@@ -7,6 +7,8 @@ particularly focusing on force symmetry and energy conservation.
 
 import sys
 import os
+import math
+import tempfile
 import unittest
 from pygame.math import Vector2
 
@@ -15,6 +17,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from bodies import Body
 from physics import PhysicsEngine
+from physics_kernels import NUMBA_AVAILABLE
+from utils import load_simulation_state, save_simulation_state_npz
 
 
 class TestPhysics(unittest.TestCase):
@@ -60,8 +64,8 @@ class TestPhysics(unittest.TestCase):
         force_2_to_1 = self.physics_engine.calculate_gravitational_force(self.body2, self.body1)
         
         # Check that forces are equal and opposite
-        self.assertAlmostEqual(force_1_to_2.x, -force_2_to_1.x, places=10)
-        self.assertAlmostEqual(force_1_to_2.y, -force_2_to_1.y, places=10)
+        self.assertAlmostEqual(force_1_to_2[0], -force_2_to_1[0], places=10)
+        self.assertAlmostEqual(force_1_to_2[1], -force_2_to_1[1], places=10)
     
     def test_force_magnitude(self):
         """Test that gravitational force magnitude follows Newton's law."""
@@ -73,7 +77,287 @@ class TestPhysics(unittest.TestCase):
         expected_magnitude = self.G * self.body1.mass * self.body2.mass / 1.0**2
         
         # Check force magnitude
-        self.assertAlmostEqual(force.length(), expected_magnitude, places=10)
+        self.assertAlmostEqual(math.hypot(*force), expected_magnitude, places=10)
+    
+    def test_scalar_state_properties(self):
+        """Test that the scalar properties share state with the Vector2 ones."""
+        self.body2.px = 3.0
+        self.body2.vy = -1.5
+        self.assertEqual(self.body2.pos, Vector2(3.0, 0.0))
+        self.assertEqual(self.body2.vel, Vector2(0.0, -1.5))
+        
+        self.body1.apply_force(self.physics_engine.calculate_gravitational_force(self.body1, self.body2))
+        self.assertAlmostEqual(self.body1.ax, self.G * self.body2.mass / 9.0, places=10)
+        self.assertEqual(self.body1.ay, 0.0)
+    
+    def test_vectorized_accelerations_match_pairwise_forces(self):
+        """Test that the SoA force kernel agrees with the pairwise force."""
+        bodies = [self.body1, self.body2, self.body3]
+        
+        # Sum the pairwise forces on each body and convert to acceleration
+        expected = []
+        for body in bodies:
+            force = Vector2(0, 0)
+            for other in bodies:
+                if other is not body:
+                    force += Vector2(self.physics_engine.calculate_gravitational_force(body, other))
+            expected.append(force / body.mass)
+        
+        self.physics_engine._sync_from_bodies(bodies)
+        self.physics_engine._compute_accelerations()
+        
+        for body, acc in zip(bodies, expected):
+            self.assertAlmostEqual(body.acc.x, acc.x, places=10)
+            self.assertAlmostEqual(body.acc.y, acc.y, places=10)
+    
+    @unittest.skipUnless(NUMBA_AVAILABLE, "Numba is not installed")
+    def test_numba_kernels_match_numpy(self):
+        """Test that the compiled kernels agree with the NumPy fallback."""
+        bodies = [self.body1, self.body2, self.body3]
+        engine = self.physics_engine
+        engine._sync_from_bodies(bodies)
+        
+        engine.use_numba = False
+        engine._compute_accelerations()
+        numpy_acc = engine.acc.copy()
+        numpy_energy = engine._compute_energy()  # Bypass the energy cache
+        
+        engine.use_numba = True
+        engine._compute_accelerations()
+        numba_energy = engine._compute_energy()
+        
+        for expected, actual in zip(numpy_acc.ravel(), engine.acc.ravel()):
+            self.assertAlmostEqual(actual, expected, places=10)
+        for expected, actual in zip(numpy_energy, numba_energy):
+            self.assertAlmostEqual(actual, expected, places=10)
+    
+    @unittest.skipUnless(NUMBA_AVAILABLE, "Numba is not installed")
+    def test_parallel_kernel_matches_serial(self):
+        """Test that the threaded full-N^2 kernel agrees with the symmetric one."""
+        bodies = [self.body1, self.body2, self.body3]
+        engine = self.physics_engine
+        engine._sync_from_bodies(bodies)
+        engine._compute_accelerations()
+        serial_acc = engine.acc.copy()
+        
+        # Force the parallel path regardless of the thread count
+        engine._parallel = True
+        engine._compute_accelerations()
+        
+        for expected, actual in zip(serial_acc.ravel(), engine.acc.ravel()):
+            self.assertAlmostEqual(actual, expected, places=10)
+    
+    def test_momentum_conservation(self):
+        """Test that pairwise forces conserve total momentum."""
+        bodies = [self.body1, self.body2, self.body3]
+        
+        for _ in range(100):
+            self.physics_engine.step_verlet(bodies, 0.001)
+        
+        # Bodies start at rest, so total momentum must stay zero
+        momentum = Vector2(0, 0)
+        for body in bodies:
+            momentum += body.mass * body.vel
+        self.assertAlmostEqual(momentum.x, 0.0, places=10)
+        self.assertAlmostEqual(momentum.y, 0.0, places=10)
+    
+    def test_mass_change_invalidates_cache(self):
+        """Test that changing a mass rebuilds the cached mass products."""
+        bodies = [self.body1, self.body2]
+        self.physics_engine.prepare(bodies)
+        
+        self.body2.mass = 4.0
+        _, potential, _ = self.physics_engine.calculate_system_energy(bodies)
+        
+        # PE = -G * m1 * m2 / r with r = 1
+        self.assertAlmostEqual(potential, -self.G * 1.0 * 4.0, places=10)
+    
+    def test_softening_keeps_coincident_bodies_finite(self):
+        """Test that softening avoids the singularity of coincident bodies."""
+        self.body2.pos = Vector2(self.body1.pos)
+        bodies = [self.body1, self.body2]
+        
+        force = self.physics_engine.calculate_gravitational_force(self.body1, self.body2)
+        self.assertEqual(force, (0.0, 0.0))
+        
+        self.physics_engine.step_verlet(bodies, 0.001)
+        _, potential, _ = self.physics_engine.calculate_system_energy(bodies)
+        self.assertTrue(math.isfinite(potential))
+        for body in bodies:
+            self.assertTrue(math.isfinite(body.pos.x) and math.isfinite(body.pos.y))
+    
+    def test_non_positive_softening_is_rejected(self):
+        """Test that a zero or negative softening length is refused up front."""
+        for softening in (0.0, -1e-6):
+            with self.assertRaises(ValueError):
+                PhysicsEngine(G=self.G, softening=softening)
+    
+    def test_energy_cache_invalidation(self):
+        """Test that the cached energy is refreshed after state changes."""
+        bodies = [self.body1, self.body2]
+        _, potential, _ = self.physics_engine.calculate_system_energy(bodies)
+        self.assertAlmostEqual(potential, -2.0 * self.G, places=10)
+        
+        # Moving a body through its setter must invalidate the cache
+        self.body2.pos = Vector2(2, 0)
+        _, potential, _ = self.physics_engine.calculate_system_energy(bodies)
+        self.assertAlmostEqual(potential, -1.0 * self.G, places=10)
+        
+        # So must an integration step
+        self.physics_engine.step_verlet(bodies, 0.01)
+        kinetic, _, _ = self.physics_engine.calculate_system_energy(bodies)
+        self.assertGreater(kinetic, 0.0)
+    
+    def test_trail_ring_buffer_order(self):
+        """Test that the trail keeps the most recent positions in order."""
+        body = Body(mass=1.0, pos=Vector2(0, 0), vel=Vector2(0, 0),
+                    radius=1, color=(255, 255, 255), trail_length=3)
+        for x in range(1, 5):
+            body.pos = Vector2(x, 0)
+            body.update_trail()
+        
+        self.assertEqual(body.trail_fill, 3)
+        self.assertEqual(body.trail_points()[:, 0].tolist(), [2.0, 3.0, 4.0])
+    
+    @unittest.skipUnless(NUMBA_AVAILABLE, "Numba is not installed")
+    def test_unrolled_three_body_step_matches_general(self):
+        """Test that the unrolled 3-body Verlet kernel matches the general path."""
+        bodies = [self.body1, self.body2, self.body3]
+        self.body2.vel = Vector2(0, 0.5)
+        copies = [Body.from_dict(body.to_dict()) for body in bodies]
+        
+        general = PhysicsEngine(G=self.G)
+        general.use_numba = False
+        for _ in range(100):
+            self.physics_engine.step_verlet(bodies, 0.001)
+            general.step_verlet(copies, 0.001)
+        
+        for body, copy in zip(bodies, copies):
+            self.assertAlmostEqual(body.pos.x, copy.pos.x, places=10)
+            self.assertAlmostEqual(body.pos.y, copy.pos.y, places=10)
+            self.assertAlmostEqual(body.vel.x, copy.vel.x, places=10)
+            self.assertAlmostEqual(body.vel.y, copy.vel.y, places=10)
+    
+    def test_reset_restores_prepared_state(self):
+        """Test that reset restores the state captured by prepare."""
+        bodies = [self.body1, self.body2, self.body3]
+        self.physics_engine.prepare(bodies)
+        initial = [(body.pos, body.vel) for body in bodies]
+        
+        for _ in range(10):
+            self.physics_engine.step_verlet(bodies, 0.01)
+        self.physics_engine.reset()
+        
+        self.assertEqual(self.physics_engine.time_elapsed, 0.0)
+        for body, (pos, vel) in zip(bodies, initial):
+            self.assertEqual(body.pos, pos)
+            self.assertEqual(body.vel, vel)
+    
+    def test_engine_records_trails(self):
+        """Test that the engine's shared trail buffer follows the bodies."""
+        bodies = [self.body1, self.body2]
+        self.body2.vel = Vector2(0, 1)
+        for step in range(5):
+            self.physics_engine.step_verlet(bodies, 0.01, record_trail=(step % 2 == 0))
+        
+        # One point from binding plus three recorded steps
+        for body in bodies:
+            points = body.trail_points()
+            self.assertEqual(len(points), 4)
+            self.assertAlmostEqual(float(points[-1, 0]), body.pos.x, places=5)
+            self.assertAlmostEqual(float(points[-1, 1]), body.pos.y, places=5)
+    
+    @unittest.skipUnless(NUMBA_AVAILABLE, "Numba is not installed")
+    def test_compiled_steps_match_numpy(self):
+        """Test that the compiled N-body integrator steps match the NumPy path."""
+        for method in ('step_euler', 'step_verlet'):
+            bodies = [Body.from_dict(body.to_dict()) for body in (self.body1, self.body2)]
+            copies = [Body.from_dict(body.to_dict()) for body in bodies]
+            
+            compiled = PhysicsEngine(G=self.G)
+            general = PhysicsEngine(G=self.G)
+            general.use_numba = False
+            for _ in range(100):
+                getattr(compiled, method)(bodies, 0.001)
+                getattr(general, method)(copies, 0.001)
+            
+            for body, copy in zip(bodies, copies):
+                self.assertAlmostEqual(body.pos.x, copy.pos.x, places=10)
+                self.assertAlmostEqual(body.pos.y, copy.pos.y, places=10)
+                self.assertAlmostEqual(body.vel.x, copy.vel.x, places=10)
+                self.assertAlmostEqual(body.vel.y, copy.vel.y, places=10)
+    
+    def test_verlet_evaluates_forces_once_per_step(self):
+        """Test that Verlet reuses the end-of-step accelerations across steps."""
+        bodies = [self.body1, self.body2, self.body3]
+        self.physics_engine.use_numba = False
+        
+        calls = []
+        compute = self.physics_engine._compute_accelerations
+        def counting_compute():
+            calls.append(1)
+            compute()
+        self.physics_engine._compute_accelerations = counting_compute
+        
+        for _ in range(100):
+            self.physics_engine.step_verlet(bodies, 0.001)
+        
+        # One evaluation to start the first step, then one per step
+        self.assertEqual(len(calls), 101)
+        
+        # The first step drifts with the true initial acceleration
+        body1 = Body(mass=1.0, pos=Vector2(0, 0), vel=Vector2(0, 0), radius=1, color=(255, 0, 0))
+        body2 = Body(mass=2.0, pos=Vector2(1, 0), vel=Vector2(0, 0), radius=1, color=(0, 255, 0))
+        engine = PhysicsEngine(G=self.G)
+        engine.step_verlet([body1, body2], 0.001)
+        self.assertAlmostEqual(body1.pos.x, 0.5 * 2.0 * 0.001 ** 2, places=12)
+    
+    def test_npz_save_round_trip(self):
+        """Test that an NPZ save loads back into equivalent bodies."""
+        bodies = [self.body1, self.body2, self.body3]
+        self.body2.vel = Vector2(0, 0.5)
+        for _ in range(10):
+            self.physics_engine.step_verlet(bodies, 0.001)
+        physics_config = {"G": self.G, "dt": 0.001}
+        
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "save.npz")
+            self.assertEqual(save_simulation_state_npz(self.physics_engine, bodies, physics_config, filename),
+                             filename)
+            loaded, loaded_config = load_simulation_state(filename)
+        
+        self.assertEqual(loaded_config, physics_config)
+        self.assertEqual([body.to_dict() for body in loaded], [body.to_dict() for body in bodies])
+    
+    def test_corrupt_npz_save_fails_gracefully(self):
+        """Test that loading an empty or truncated NPZ save returns no bodies."""
+        bodies = [self.body1, self.body2]
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "save.npz")
+            save_simulation_state_npz(self.physics_engine, bodies, {}, filename)
+            with open(filename, 'rb') as f:
+                data = f.read()
+            
+            for corrupt in (b"", data[:len(data) // 2]):
+                with open(filename, 'wb') as f:
+                    f.write(corrupt)
+                self.assertEqual(load_simulation_state(filename), ([], {}))
+    
+    def test_bodies_moved_between_engines(self):
+        """Test that an engine rebinds bodies another engine has since adopted."""
+        bodies = [self.body1, self.body2]
+        other = PhysicsEngine(G=self.G)
+        
+        self.physics_engine.step_verlet(bodies, 0.001)
+        other.step_verlet(bodies, 0.001)
+        before = self.body2.pos
+        self.physics_engine.step_verlet(bodies, 0.001)
+        
+        # The first engine steps the bodies themselves, not a stale copy
+        self.assertNotEqual(self.body2.pos, before)
+        for i, body in enumerate(bodies):
+            self.assertEqual(body.pos.x, self.physics_engine.pos[i, 0])
+            self.assertEqual(body.pos.y, self.physics_engine.pos[i, 1])
     
     def test_energy_conservation_euler(self):
         """Test energy conservation with Euler integration."""
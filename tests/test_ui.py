@@ -0,0 +1,44 @@
+"""
+test_ui.py - Unit tests for the UI elements.
+
+This module contains tests for the UI elements that do not need a
+visible display.
+"""
+
+import sys
+import os
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ui import Button, Slider
+
+
+class TestUI(unittest.TestCase):
+    """Test cases for the UI elements."""
+    
+    def test_elements_survive_pygame_reinit(self):
+        """Test that the shared fonts are reloaded after Pygame is re-initialized."""
+        pygame.init()
+        Button((0, 0, 80, 30), "Pause", lambda: None)
+        pygame.quit()
+        
+        pygame.init()
+        try:
+            button = Button((0, 0, 80, 30), "Pause", lambda: None)
+            slider = Slider((0, 50, 100, 10), 0.0, 1.0, 0.5, "Speed", lambda value: None)
+            surface = pygame.Surface((200, 100))
+            button.draw(surface)
+            slider.draw(surface)
+            self.assertIsNotNone(button.font)
+            self.assertIsNotNone(slider.font)
+        finally:
+            pygame.quit()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,38 @@ This module handles user input and UI elements for the simulation.
 
 import pygame
 from pygame.math import Vector2
-from typing import Tuple, Dict, Any, Callable, Optional
+from typing import Tuple, Dict, Any, Callable, List, Optional
+
+
+_BORDER_COLOR = pygame.Color(0, 0, 0)
+
+# Fonts shared by all UI elements, keyed by point size. These are
+# pygame.font fonts rather than pygame.freetype: the elements cache their
+# rendered text, so the renderer only runs when a label changes, and there
+# pygame.font renders small labels considerably faster.
+_FONT_CACHE: Dict[int, pygame.font.Font] = {}
+
+
+def _get_font(size: int) -> Optional[pygame.font.Font]:
+    """
+    Get the shared UI font of a given size, loading it on first use.
+    
+    Args:
+        size: Font size in points
+        
+    Returns:
+        The font, or None if the Pygame font module is not initialized
+    """
+    if not pygame.font.get_init():
+        return None
+    font = _FONT_CACHE.get(size)
+    if font is None:
+        if not _FONT_CACHE:
+            # Fonts die with the font module; drop them when Pygame shuts down.
+            # Quit callbacks are consumed by pygame.quit, so register per fill.
+            pygame.register_quit(_FONT_CACHE.clear)
+        font = _FONT_CACHE[size] = pygame.font.SysFont("Arial", size)
+    return font
 
 
 class Button:
@@ -14,6 +45,9 @@ class Button:
     Simple button class for UI interactions.
     """
     
+    __slots__ = ('rect', 'text', 'action', 'color', 'hover_color', 'text_color', 'hovered', 'font',
+                 '_text_key', '_text_surface', '_text_rect')
+    
     def __init__(self, rect: Tuple[int, int, int, int], text: str, 
                  action: Callable, color: Tuple[int, int, int] = (100, 100, 100),
                  hover_color: Tuple[int, int, int] = (150, 150, 150),
@@ -32,16 +66,29 @@ class Button:
         self.rect = pygame.Rect(rect)
         self.text = text
         self.action = action
-        self.color = color
-        self.hover_color = hover_color
-        self.text_color = text_color
+        
+        # Colors are converted once here rather than on every draw call
+        self.color = pygame.Color(color)
+        self.hover_color = pygame.Color(hover_color)
+        self.text_color = pygame.Color(text_color)
         self.hovered = False
         
-        # Initialize font if Pygame is initialized
-        if pygame.font.get_init():
-            self.font = pygame.font.SysFont("Arial", 16)
-        else:
-            self.font = None
+        # Use the shared font if Pygame is initialized
+        self.font = _get_font(16)
+        
+        # Rendered text, reused until the text, color or position changes
+        self._text_key = None
+        self._text_surface = None
+        self._text_rect = None
+        self._update_text()
+    
+    def _update_text(self):
+        """Re-render the cached text surface if the button text has changed."""
+        key = (self.text, self.text_color, self.rect.center)
+        if key != self._text_key and self.font:
+            self._text_surface = self.font.render(self.text, True, self.text_color)
+            self._text_rect = self._text_surface.get_rect(center=self.rect.center)
+            self._text_key = key
     
     def draw(self, surface: pygame.Surface):
         """
@@ -50,15 +97,30 @@ class Button:
         Args:
             surface: Surface to draw on
         """
-        # Draw button background
+        self.draw_shapes(surface)
+        surface.blits(self.collect_blits())
+    
+    def draw_shapes(self, surface: pygame.Surface):
+        """
+        Draw the button background and border, without the text.
+        
+        Args:
+            surface: Surface to draw on
+        """
         pygame.draw.rect(surface, self.hover_color if self.hovered else self.color, self.rect)
-        pygame.draw.rect(surface, (0, 0, 0), self.rect, 2)  # Border
+        pygame.draw.rect(surface, _BORDER_COLOR, self.rect, 2)  # Border
+    
+    def collect_blits(self) -> List[Tuple[pygame.Surface, pygame.Rect]]:
+        """
+        Get the text blits of the button.
         
-        # Draw text if font is available
-        if self.font:
-            text_surface = self.font.render(self.text, True, self.text_color)
-            text_rect = text_surface.get_rect(center=self.rect.center)
-            surface.blit(text_surface, text_rect)
+        Returns:
+            List of (surface, rect) pairs; empty if no font is available
+        """
+        if not self.font:
+            return []
+        self._update_text()
+        return [(self._text_surface, self._text_rect)]
     
     def update(self, mouse_pos: Tuple[int, int]) -> bool:
         """
@@ -95,6 +157,10 @@ class Slider:
     Simple slider class for adjusting numeric values.
     """
     
+    __slots__ = ('rect', 'min_value', 'max_value', 'value', 'label', 'callback', 'color', 'handle_color',
+                 'text_color', 'dragging', 'handle_width', 'handle_height', 'handle_rect', 'font',
+                 '_text_key', '_text_surface', '_text_rect')
+    
     def __init__(self, rect: Tuple[int, int, int, int], min_value: float, max_value: float, 
                  initial_value: float, label: str, callback: Callable[[float], None],
                  color: Tuple[int, int, int] = (100, 100, 100),
@@ -120,24 +186,41 @@ class Slider:
         self.value = initial_value
         self.label = label
         self.callback = callback
-        self.color = color
-        self.handle_color = handle_color
-        self.text_color = text_color
+        
+        # Colors are converted once here rather than on every draw call
+        self.color = pygame.Color(color)
+        self.handle_color = pygame.Color(handle_color)
+        self.text_color = pygame.Color(text_color)
         self.dragging = False
         
         # Calculate handle position
         self.handle_width = 10
         self.handle_height = self.rect.height + 4
+        self.handle_rect = pygame.Rect(0, 0, self.handle_width, self.handle_height)
         self.update_handle_pos()
         
-        # Initialize font if Pygame is initialized
-        if pygame.font.get_init():
-            self.font = pygame.font.SysFont("Arial", 14)
-        else:
-            self.font = None
+        # Use the shared font if Pygame is initialized
+        self.font = _get_font(14)
+        
+        # Rendered label, reused until the label or the displayed value changes
+        self._text_key = None
+        self._text_surface = None
+        self._text_rect = None
+        self._update_text()
+    
+    def _update_text(self):
+        """Re-render the cached label surface if the displayed text has changed."""
+        # Formatting is cheap next to rendering, and the formatted text changes
+        # only when the value moves by a displayed hundredth
+        text = f"{self.label}: {self.value:.2f}"
+        key = (text, self.text_color, self.rect.topleft)
+        if key != self._text_key and self.font:
+            self._text_surface = self.font.render(text, True, self.text_color)
+            self._text_rect = self._text_surface.get_rect(midleft=(self.rect.x, self.rect.y - 10))
+            self._text_key = key
     
     def update_handle_pos(self):
-        """Update the handle position based on the current value."""
+        """Move the handle to the current value, in place."""
         value_range = self.max_value - self.min_value
         if value_range == 0:
             value_range = 1  # Avoid division by zero
@@ -145,17 +228,23 @@ class Slider:
         value_fraction = (self.value - self.min_value) / value_range
         handle_x = self.rect.x + int(value_fraction * self.rect.width) - self.handle_width // 2
         
-        self.handle_rect = pygame.Rect(
-            handle_x, 
-            self.rect.y - 2, 
-            self.handle_width, 
-            self.handle_height
-        )
+        self.handle_rect.x = handle_x
+        self.handle_rect.y = self.rect.y - 2
     
     def draw(self, surface: pygame.Surface):
         """
         Draw the slider on a surface.
         
+        Args:
+            surface: Surface to draw on
+        """
+        self.draw_shapes(surface)
+        surface.blits(self.collect_blits())
+    
+    def draw_shapes(self, surface: pygame.Surface):
+        """
+        Draw the slider bar and handle, without the label.
+        
         Args:
             surface: Surface to draw on
         """
@@ -164,14 +253,19 @@ class Slider:
         
         # Draw handle
         pygame.draw.rect(surface, self.handle_color, self.handle_rect)
-        pygame.draw.rect(surface, (0, 0, 0), self.handle_rect, 1)  # Border
-        
-        # Draw label and value if font is available
-        if self.font:
-            # Draw label
-            label_surface = self.font.render(f"{self.label}: {self.value:.2f}", True, self.text_color)
-            label_rect = label_surface.get_rect(midleft=(self.rect.x, self.rect.y - 10))
-            surface.blit(label_surface, label_rect)
+        pygame.draw.rect(surface, _BORDER_COLOR, self.handle_rect, 1)  # Border
+    
+    def collect_blits(self) -> List[Tuple[pygame.Surface, pygame.Rect]]:
+        """
+        Get the label blits of the slider.
+        
+        Returns:
+            List of (surface, rect) pairs; empty if no font is available
+        """
+        if not self.font:
+            return []
+        self._update_text()
+        return [(self._text_surface, self._text_rect)]
     
     def handle_event(self, event: pygame.event.Event) -> bool:
         """
@@ -195,8 +289,9 @@ class Slider:
         
         elif event.type == pygame.MOUSEMOTION and self.dragging:
             # Calculate new value based on mouse position
-            mouse_x = event.pos[0]
-            x_fraction = max(0, min(1, (mouse_x - self.rect.x) / self.rect.width))
+            rect = self.rect
+            x_fraction = (event.pos[0] - rect.x) / rect.width
+            x_fraction = 0.0 if x_fraction < 0.0 else (1.0 if x_fraction > 1.0 else x_fraction)
             self.value = self.min_value + x_fraction * (self.max_value - self.min_value)
             
             # Update handle position
@@ -223,6 +318,14 @@ class UIManager:
         """
         self.screen = screen
         self.elements = []
+        
+        # Elements grouped by the events they can react to
+        self._sliders = []
+        self._motion_elements = []  # Everything except buttons, in order
+        
+        # Bounding box of all elements; mouse events outside it are ignored
+        # unless a slider is being dragged. None if an element has no rect.
+        self._ui_bbox: Optional[pygame.Rect] = None
     
     def add_element(self, element):
         """
@@ -232,11 +335,43 @@ class UIManager:
             element: UI element to add
         """
         self.elements.append(element)
+        if not isinstance(element, Button):
+            self._motion_elements.append(element)
+            if isinstance(element, Slider):
+                self._sliders.append(element)
+        self._update_bbox()
+    
+    def _update_bbox(self):
+        """Recompute the bounding box of all elements."""
+        rects = []
+        for element in self.elements:
+            if isinstance(element, Slider):
+                # The handle overhangs the bar at either end of its travel
+                rects.append(element.rect.inflate(element.handle_width, 4))
+            elif hasattr(element, 'rect'):
+                rects.append(element.rect)
+            else:
+                self._ui_bbox = None
+                return
+        self._ui_bbox = rects[0].unionall(rects[1:])
     
     def draw(self):
-        """Draw all UI elements."""
+        """
+        Draw all UI elements.
+        
+        Shapes are drawn element by element, then all text is blitted in a
+        single ``blits`` call. Elements without ``collect_blits`` are drawn
+        with their own ``draw``.
+        """
+        screen = self.screen
+        blits = []
         for element in self.elements:
-            element.draw(self.screen)
+            if hasattr(element, 'collect_blits'):
+                element.draw_shapes(screen)
+                blits.extend(element.collect_blits())
+            else:
+                element.draw(screen)
+        screen.blits(blits, False)
     
     def handle_event(self, event: pygame.event.Event) -> bool:
         """
@@ -248,7 +383,15 @@ class UIManager:
         Returns:
             True if any element handled the event, False otherwise
         """
-        for element in self.elements:
+        # Most mouse events happen over the simulation, away from the UI
+        pos = getattr(event, 'pos', None)
+        if pos is not None and self._ui_bbox is not None and not self._ui_bbox.collidepoint(pos):
+            if not any(slider.dragging for slider in self._sliders):
+                return False
+        
+        # Buttons track hover in update(), so they never react to motion
+        elements = self._motion_elements if event.type == pygame.MOUSEMOTION else self.elements
+        for element in elements:
             if element.handle_event(event):
                 return True
         return False
@@ -6,13 +6,54 @@ file I/O, and other miscellaneous tasks.
 """
 
 import json
+import math
 import os
+import zipfile
+import numpy as np
 from datetime import datetime
 from typing import List, Dict, Any, Tuple, Optional
 import pygame
 from pygame.math import Vector2
 from bodies import Body
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_dumps(data: Any) -> bytes:
+    """
+    Serialize data to indented JSON, using orjson when it is installed.
+    
+    Args:
+        data: JSON-serializable data
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    """
+    Parse UTF-8 encoded JSON, using orjson when it is installed.
+    
+    Both parsers raise a subclass of json.JSONDecodeError on invalid input.
+    
+    Args:
+        data: UTF-8 encoded JSON
+        
+    Returns:
+        Parsed data
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """
@@ -25,8 +66,8 @@ def load_config(config_path: str) -> Dict[str, Any]:
         Dictionary containing configuration data
     """
     try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        with open(config_path, 'rb') as f:
+            return _json_loads(f.read())
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"Error loading config: {e}")
         return create_default_config()
@@ -44,8 +85,8 @@ def save_config(config: Dict[str, Any], config_path: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        with open(config_path, 'wb') as f:
+            f.write(_json_dumps(config))
         return True
     except Exception as e:
         print(f"Error saving config: {e}")
@@ -67,7 +108,7 @@ def create_default_config() -> Dict[str, Any]:
                 "velocity": [0, 0],
                 "radius": 10,
                 "color": [255, 255, 0],
-                "trail_length": 500
+                "trail_length": 50
             },
             {
                 "mass": 1.0e4,
@@ -75,7 +116,7 @@ def create_default_config() -> Dict[str, Any]:
                 "velocity": [0, 40],
                 "radius": 5,
                 "color": [0, 255, 0],
-                "trail_length": 500
+                "trail_length": 50
             },
             {
                 "mass": 1.0e4,
@@ -83,13 +124,14 @@ def create_default_config() -> Dict[str, Any]:
                 "velocity": [0, -40],
                 "radius": 5,
                 "color": [0, 0, 255],
-                "trail_length": 500
+                "trail_length": 50
             }
         ],
         "physics": {
             "G": 6.674e-11,
             "dt": 0.01,
             "scale_factor": 1.0,
+            "softening": 1e-6,
             "integrations_per_frame": 10,
             "integration_method": "verlet"
         },
@@ -129,8 +171,56 @@ def save_simulation_state(bodies: List[Body], physics_config: Dict[str, Any]) ->
     
     # Save to file
     try:
-        with open(filename, 'w') as f:
-            json.dump(save_data, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(_json_dumps(save_data))
+        print(f"Simulation saved to {filename}")
+        return filename
+    except Exception as e:
+        print(f"Error saving simulation: {e}")
+        return ""
+
+
+def save_simulation_state_npz(physics_engine, bodies: List[Body], physics_config: Dict[str, Any],
+                              filename: Optional[str] = None) -> str:
+    """
+    Save the current simulation state to a compressed NumPy archive.
+    
+    Positions, velocities and masses are written straight from the engine's
+    SoA buffers; only the rendering properties (radius, color,
+    trail_length) are gathered per body. The physics configuration and
+    timestamp are stored as JSON in a ``meta`` byte array, so the archive
+    is self-contained.
+    
+    Args:
+        physics_engine: PhysicsEngine simulating the bodies
+        bodies: List of bodies in the simulation
+        physics_config: Physics configuration
+        filename: Path to save to (defaults to a timestamped name)
+        
+    Returns:
+        Path to the saved file
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if filename is None:
+        filename = f"save_{timestamp}.npz"
+    
+    meta = _json_dumps({"physics": physics_config, "timestamp": timestamp})
+    
+    try:
+        physics_engine.bind(bodies)
+        
+        # Write through a file object so NumPy does not append another suffix
+        with open(filename, 'wb') as f:
+            np.savez_compressed(
+                f,
+                pos=physics_engine.pos,
+                vel=physics_engine.vel,
+                mass=physics_engine.mass,
+                radius=np.array([body.radius for body in bodies], dtype=np.int64),
+                color=np.array([body.color for body in bodies], dtype=np.uint8).reshape(-1, 3),
+                trail_length=np.array([body.trail_length for body in bodies], dtype=np.int64),
+                meta=np.frombuffer(meta, dtype=np.uint8)
+            )
         print(f"Simulation saved to {filename}")
         return filename
     except Exception as e:
@@ -142,6 +232,9 @@ def load_simulation_state(filename: str) -> Tuple[List[Body], Dict[str, Any]]:
     """
     Load a simulation state from a file.
     
+    Files ending in ``.npz`` are read as archives written by
+    ``save_simulation_state_npz``; anything else is read as JSON.
+    
     Args:
         filename: Path to the save file
         
@@ -149,19 +242,49 @@ def load_simulation_state(filename: str) -> Tuple[List[Body], Dict[str, Any]]:
         Tuple of (bodies, physics_config)
     """
     try:
-        with open(filename, 'r') as f:
-            save_data = json.load(f)
+        if filename.endswith('.npz'):
+            return _load_simulation_state_npz(filename)
+        
+        with open(filename, 'rb') as f:
+            save_data = _json_loads(f.read())
         
         # Create bodies from the saved data
         bodies = [Body.from_dict(body_dict) for body_dict in save_data.get("bodies", [])]
         physics_config = save_data.get("physics", {})
         
         return bodies, physics_config
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile) as e:
         print(f"Error loading simulation: {e}")
         return [], {}
 
 
+def _load_simulation_state_npz(filename: str) -> Tuple[List[Body], Dict[str, Any]]:
+    """
+    Load a simulation state from a compressed NumPy archive.
+    
+    Args:
+        filename: Path to the archive
+        
+    Returns:
+        Tuple of (bodies, physics_config)
+    """
+    with np.load(filename) as data:
+        pos = data['pos'].tolist()
+        vel = data['vel'].tolist()
+        mass = data['mass'].tolist()
+        radius = data['radius'].tolist()
+        color = data['color'].tolist()
+        trail_length = data['trail_length'].tolist()
+        meta = _json_loads(data['meta'].tobytes())
+    
+    bodies = [
+        Body(mass=mass[i], pos=pos[i], vel=vel[i], radius=radius[i],
+             color=tuple(color[i]), trail_length=trail_length[i])
+        for i in range(len(mass))
+    ]
+    return bodies, meta.get("physics", {})
+
+
 def distance(v1: Vector2, v2: Vector2) -> float:
     """
     Calculate the Euclidean distance between two vectors.
@@ -173,7 +296,23 @@ def distance(v1: Vector2, v2: Vector2) -> float:
     Returns:
         Distance between the vectors
     """
-    return (v2 - v1).length()
+    return math.hypot(v2.x - v1.x, v2.y - v1.y)
+
+
+def distance_xy(x1: float, y1: float, x2: float, y2: float) -> float:
+    """
+    Calculate the Euclidean distance between two points given as scalars.
+    
+    Args:
+        x1: X coordinate of the first point
+        y1: Y coordinate of the first point
+        x2: X coordinate of the second point
+        y2: Y coordinate of the second point
+        
+    Returns:
+        Distance between the points
+    """
+    return math.hypot(x2 - x1, y2 - y1)
 
 
 def format_scientific(value: float, precision: int = 2) -> str: